@@ -7,6 +7,18 @@ from .io import AtomicSaver
 from .logging import log
 from .utils import comment, dedup, format_requirement, key_from_req, UNSAFE_PACKAGES
 
+MESSAGE_UNSAFE_PACKAGES = comment('# The following packages are considered to be '
+                                  'unsafe in a requirements file:')
+
+_LINESEP = os.linesep.encode('utf-8')
+
+
+def _to_bytes(line):
+    # Lines without an ESC byte have no ANSI codes, so skip unstyle() for them
+    if '\x1b' in line:
+        line = unstyle(line)
+    return line.encode('utf-8')
+
 
 class OutputWriter(object):
     def __init__(self, src_files, dst_file, dry_run, emit_header, emit_index,
@@ -66,9 +78,9 @@ class OutputWriter(object):
                 yield '--trusted-host {}'.format(trusted_host)
 
     def write_format_controls(self):
-        for nb in dedup(self.format_control.no_binary):
+        for nb in sorted(self.format_control.no_binary):
             yield '--no-binary {}'.format(nb)
-        for ob in dedup(self.format_control.only_binary):
+        for ob in sorted(self.format_control.only_binary):
             yield '--only-binary {}'.format(ob)
 
     def write_flags(self):
@@ -81,15 +93,19 @@ class OutputWriter(object):
         if emitted:
             yield ''
 
-    def _iter_lines(self, results, unsafe_requirements, reverse_dependencies,
-                    primary_packages, markers, hashes, allow_unsafe=False):
-        for line in self.write_header():
-            yield line
-        for line in self.write_flags():
-            yield line
+    def _collect_lines(self, results, unsafe_requirements, reverse_dependencies,
+                       primary_packages, markers, hashes, allow_unsafe=False):
+        lines = list(chain(self.write_header(), self.write_flags()))
 
-        unsafe_requirements = {r for r in results if r.name in UNSAFE_PACKAGES} if not unsafe_requirements else unsafe_requirements  # noqa
-        packages = {r for r in results if r.name not in UNSAFE_PACKAGES}
+        packages = set()
+        computed_unsafe = set()
+        for r in results:
+            if r.name in UNSAFE_PACKAGES:
+                computed_unsafe.add(r)
+            else:
+                packages.add(r)
+        if not unsafe_requirements:
+            unsafe_requirements = computed_unsafe
 
         packages = sorted(packages, key=self._sort_key)
 
@@ -97,12 +113,12 @@ class OutputWriter(object):
             line = self._format_requirement(
                 ireq, reverse_dependencies, primary_packages,
                 markers.get(key_from_req(ireq.req)), hashes=hashes)
-            yield line
+            lines.append(line)
 
         if unsafe_requirements:
             unsafe_requirements = sorted(unsafe_requirements, key=self._sort_key)
-            yield ''
-            yield comment('# The following packages are considered to be unsafe in a requirements file:')
+            lines.append('')
+            lines.append(MESSAGE_UNSAFE_PACKAGES)
 
             for ireq in unsafe_requirements:
                 req = self._format_requirement(ireq,
@@ -111,9 +127,17 @@ class OutputWriter(object):
                                                marker=markers.get(key_from_req(ireq.req)),
                                                hashes=hashes)
                 if not allow_unsafe:
-                    yield comment('# {}'.format(req))
+                    lines.append(comment('# {}'.format(req)))
                 else:
-                    yield req
+                    lines.append(req)
+
+        return lines
+
+    def _iter_lines(self, results, unsafe_requirements, reverse_dependencies,
+                    primary_packages, markers, hashes, allow_unsafe=False):
+        for line in self._collect_lines(results, unsafe_requirements, reverse_dependencies,
+                                        primary_packages, markers, hashes, allow_unsafe=allow_unsafe):
+            yield line
 
     def write(self, results, unsafe_requirements, reverse_dependencies,
               primary_packages, markers, hashes, allow_unsafe=False):
@@ -122,17 +146,17 @@ class OutputWriter(object):
             if not self.dry_run:
                 f = stack.enter_context(AtomicSaver(self.dst_file))
 
-            for line in self._iter_lines(results, unsafe_requirements, reverse_dependencies,
-                                         primary_packages, markers, hashes, allow_unsafe=allow_unsafe):
-                log.info(line)
-                if f:
-                    f.write(unstyle(line).encode('utf-8'))
-                    f.write(os.linesep.encode('utf-8'))
+            lines = self._collect_lines(results, unsafe_requirements, reverse_dependencies,
+                                        primary_packages, markers, hashes, allow_unsafe=allow_unsafe)
+            if lines:
+                log.info('\n'.join(lines))
+            if f:
+                f.writelines(_to_bytes(line) + _LINESEP for line in lines)
 
     def _format_requirement(self, ireq, reverse_dependencies, primary_packages, marker=None, hashes=None):
         line = format_requirement(ireq, marker=marker)
 
-        ireq_hashes = (hashes if hashes is not None else {}).get(ireq)
+        ireq_hashes = hashes.get(ireq) if hashes else None
         if ireq_hashes:
             for hash_ in sorted(ireq_hashes):
                 line += " \\\n    --hash={}".format(hash_)
@@ -1,6 +1,9 @@
+import os
+
 from pytest import fixture
 
 from piptools._compat import FormatControl
+from piptools.logging import log
 from piptools.utils import comment
 from piptools.writer import OutputWriter
 
@@ -99,3 +102,56 @@ def test_iter_lines__unsafe_dependencies(from_line, writer):
     assert comment('# The following packages are considered to be unsafe in a requirements file:') in str_lines
     assert comment('# setuptools') in str_lines
     assert 'test==1.2' in str_lines
+
+
+def test_write_format_controls(writer):
+    writer.format_control = FormatControl(no_binary={'b', 'a'}, only_binary={'d', 'c'})
+
+    assert list(writer.write_format_controls()) == [
+        '--no-binary a',
+        '--no-binary b',
+        '--only-binary c',
+        '--only-binary d',
+    ]
+
+
+def test_write_strips_styles_and_terminates_every_line(from_line, writer, tmpdir):
+    dst_file = tmpdir.join('requirements.txt')
+    writer.dst_file = str(dst_file)
+    writer.dry_run = False
+    writer.emit_header = False
+
+    writer.write(results=[from_line('test==1.2')],
+                 unsafe_requirements=[from_line('setuptools')],
+                 reverse_dependencies={'test': ['xyz']},
+                 primary_packages=[],
+                 markers={},
+                 hashes=None)
+
+    expected_lines = [
+        'test==1.2                 # via xyz',
+        '',
+        '# The following packages are considered to be unsafe in a requirements file:',
+        '# setuptools',
+    ]
+    expected = ''.join(line + os.linesep for line in expected_lines).encode('utf-8')
+    assert dst_file.read_binary() == expected
+
+
+def test_write_logs_same_output_as_per_line_logging(from_line, writer, capsys):
+    args = ([from_line('test==1.2')], [from_line('setuptools')], {'test': ['xyz']}, [], {}, None)
+
+    for line in writer._iter_lines(*args):
+        log.info(line)
+    per_line_output = capsys.readouterr()
+
+    writer.write(*args)
+    assert capsys.readouterr() == per_line_output
+
+
+def test_write_logs_nothing_without_lines(writer, capsys):
+    writer.emit_header = False
+
+    writer.write(results=[], unsafe_requirements=[], reverse_dependencies={},
+                 primary_packages=[], markers={}, hashes=None)
+    assert capsys.readouterr().out == ''